@@ -20,6 +20,34 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("package_manager")
 
+# Source of each mock yaml/__init__.py, filled in with %-formatting per version
+_INIT_TEMPLATE = """
+# Mock PyYAML version %(version)s for demonstration
+__version__ = "%(version)s"
+
+# Import actual yaml functionality
+import yaml as real_yaml
+from yaml import *
+
+# Override dump to demonstrate version difference
+def dump(data, stream=None, **kwargs):
+    if stream is None:
+        result = real_yaml.dump(data, stream, **kwargs)
+        return result + "# Version %(version)s output"
+    result = real_yaml.dump(data, **kwargs)
+    stream.write(result)
+    stream.write("# Version %(version)s output")
+    return stream
+
+# Add version-specific functionality
+def get_version_info():
+    return {
+        "version": "%(version)s",
+        "is_mock": True,
+        "capabilities": ["basic", "custom-%(version)s"]
+    }
+"""
+
 def create_yaml_versions(base_dir, versions):
     """
     Create multiple mock YAML versions for demonstration
@@ -35,8 +63,7 @@ def create_yaml_versions(base_dir, versions):
 
     for version in versions:
         # Create directory for this version
-        version_dir = os.path.join(base_dir, f"yaml-{version}")
-        yaml_dir = os.path.join(version_dir, "yaml")
+        yaml_dir = os.path.join(base_dir, f"yaml-{version}", "yaml")
         os.makedirs(yaml_dir, exist_ok=True)
 
         print(f"Created directory: {yaml_dir}")
@@ -44,43 +71,12 @@ def create_yaml_versions(base_dir, versions):
         # Create __init__.py with custom version and behavior
         init_file = os.path.join(yaml_dir, "__init__.py")
         with open(init_file, "w") as f:
-            f.write(f"""
-# Mock PyYAML version {version} for demonstration
-__version__ = "{version}"
-
-# Import actual yaml functionality
-import yaml as real_yaml
-from yaml import *
-
-# Override dump to demonstrate version difference
-def dump(data, stream=None, **kwargs):
-    if stream is None:
-        result = real_yaml.dump(data, stream, **kwargs)
-        return result + f"# Version {version} output"
-    result = real_yaml.dump(data, **kwargs)
-    stream.write(result)
-    stream.write(f"# Version {version} output")
-    return stream
-
-# Add version-specific functionality
-def get_version_info():
-    return {{
-        "version": "{version}",
-        "is_mock": True,
-        "capabilities": ["basic", "custom-{version}"]
-    }}
-""")
+            f.write(_INIT_TEMPLATE % {"version": version})
         print(f"Created __init__.py at: {init_file}")
-        # Verify file exists
-        if os.path.exists(init_file):
-            print(f"Verified __init__.py exists at: {init_file}")
-        else:
-            print(f"ERROR: Failed to create __init__.py at: {init_file}")
 
         # Register yaml directory, this is the key fix
         version_paths[version] = yaml_dir
         print(f"Registered version {version} at path: {yaml_dir}")
-        print(f"Directory contents: {os.listdir(yaml_dir)}")
 
     return version_paths
 
@@ -109,26 +105,33 @@ def main():
 
     # Dynamic version discovery and registration with metadata
     print("\nDynamically discovering and registering versions...")
-    for version, path in version_paths.items():
-        try:
-            # Verify path exists and contents
-            print(f"Verifying path for {version}: {path}")
-            print(f"Path exists: {os.path.exists(path)}")
-            print(f"Path is directory: {os.path.isdir(path)}")
-            if os.path.exists(path):
-                print(f"Directory contents: {os.listdir(path)}")
-                init_file = os.path.join(path, "__init__.py")
-                print(f"__init__.py exists: {os.path.exists(init_file)}")
-
-            metadata = {
-                "source": "mock",
-                "created_at": "2025-03-25",
-                "purpose": "demonstration"
-            }
-            pkg_ver = yaml_manager.register_version(version, path, metadata=metadata)
-            print(f"Registered version {version} at {path}")
-        except ValueError as e:
-            print(f"Failed to register {version}: {e}")
+    # Save the configuration once after the loop rather than per version
+    with yaml_manager.batch():
+        for version, path in version_paths.items():
+            try:
+                # Verify path and contents with a single directory scan
+                print(f"Verifying path for {version}: {path}")
+                try:
+                    with os.scandir(path) as it:
+                        contents = [entry.name for entry in it]
+                except FileNotFoundError:
+                    print("Path exists: False")
+                except NotADirectoryError:
+                    print("Path is directory: False")
+                else:
+                    print("Path is directory: True")
+                    print(f"Directory contents: {contents}")
+                    print(f"__init__.py exists: {'__init__.py' in contents}")
+
+                metadata = {
+                    "source": "mock",
+                    "created_at": "2025-03-25",
+                    "purpose": "demonstration"
+                }
+                pkg_ver = yaml_manager.register_version(version, path, metadata=metadata)
+                print(f"Registered version {version} at {path}")
+            except ValueError as e:
+                print(f"Failed to register {version}: {e}")
 
     # List all versions with details
     print("\nDetailed version listing:")
@@ -184,11 +187,12 @@ def main():
         ver1 = available_versions[0]
 
         # Detailed logging of first version loading process
+        path1 = yaml_manager.versions[ver1].path
         print(f"Loading first version: {ver1}")
-        print(f"Version path: {yaml_manager.versions[ver1].path}")
-        print(f"Path exists: {os.path.exists(yaml_manager.versions[ver1].path)}")
-        if os.path.exists(yaml_manager.versions[ver1].path):
-            print(f"Directory contents: {os.listdir(yaml_manager.versions[ver1].path)}")
+        print(f"Version path: {path1}")
+        print(f"Path exists: {os.path.exists(path1)}")
+        if os.path.exists(path1):
+            print(f"Directory contents: {os.listdir(path1)}")
 
         yaml1 = yaml_manager.use_version(ver1)
         print(f"Using {ver1}:")
@@ -198,12 +202,13 @@ def main():
         ver2 = available_versions[1]
 
         # Detailed logging of second version loading process
+        path2 = yaml_manager.versions[ver2].path
         print(f"Loading second version: {ver2}")
-        print(f"Version path: {yaml_manager.versions[ver2].path}")
-        print(f"Path exists: {os.path.exists(yaml_manager.versions[ver2].path)}")
-        if os.path.exists(yaml_manager.versions[ver2].path):
-            print(f"Directory contents: {os.listdir(yaml_manager.versions[ver2].path)}")
-            init_file = os.path.join(yaml_manager.versions[ver2].path, "__init__.py")
+        print(f"Version path: {path2}")
+        print(f"Path exists: {os.path.exists(path2)}")
+        if os.path.exists(path2):
+            print(f"Directory contents: {os.listdir(path2)}")
+            init_file = os.path.join(path2, "__init__.py")
             print(f"__init__.py exists: {os.path.exists(init_file)}")
 
         yaml2 = yaml_manager.use_version(ver2)
@@ -14,13 +14,36 @@ Features:
 __version__ = "1.0.0.dev1"
 __author__ = "vistart"
 
-# Import public classes and functions
-from .version import PackageVersion
-from .manager import PackageManager
-from .registry import get_package_manager, _package_managers
-from .utils import setup_package_manager, import_version, create_decorator
+import importlib
+
 from .exceptions import PackageManagerError, PackageNotFoundError, VersionNotFoundError
 
+# Public names resolved lazily from their submodules on first access
+_LAZY_ATTRS = {
+    'PackageVersion': '.version',
+    'PackageManager': '.manager',
+    'get_package_manager': '.registry',
+    '_package_managers': '.registry',
+    'setup_package_manager': '.utils',
+    'import_version': '.utils',
+    'create_decorator': '.utils',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 # Define public API
 __all__ = [
     'PackageVersion',
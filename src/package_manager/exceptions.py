@@ -2,6 +2,9 @@
 Exception classes for the package manager
 """
 
+import os
+import stat
+
 
 class PackageManagerError(Exception):
     """Base exception for all package manager errors"""
@@ -23,9 +26,37 @@ class VersionNotFoundError(PackageManagerError):
         super().__init__(f"Version {version} not found for package {package_name}")
 
 
-class ImportError(PackageManagerError):
+class PackageImportError(PackageManagerError):
     """Raised when a package cannot be imported"""
-    pass
+
+    def __init__(self, message, path=None, detail=None):
+        self.path = path
+        self.detail = detail
+        super().__init__(message)
+
+    @classmethod
+    def for_path(cls, path, reason):
+        """
+        Create an error for a path that could not be loaded
+
+        The state of the path on disk is recorded once, here, so every
+        rendering of the error reports the same thing.
+        """
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            st = None
+        is_dir = stat.S_ISDIR(st.st_mode) if st is not None else 'N/A'
+        return cls(f"{reason} at {path}. "
+                   f"Path exists: {st is not None}. "
+                   f"Path is directory: {is_dir}.",
+                   path=path)
+
+    def __str__(self):
+        message = super().__str__()
+        if self.detail is not None:
+            message = f"{message}: {self.detail}"
+        return message
 
 
 class ConfigError(PackageManagerError):
@@ -2,24 +2,37 @@
 Core package manager implementation
 """
 
+import contextvars
 import importlib
-import inspect
 import json
 import os
 import threading
 import warnings
 from contextlib import contextmanager
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Tuple, Any
 
-from .exceptions import VersionNotFoundError, ImportError
+from .exceptions import VersionNotFoundError
 from .version import PackageVersion
 
+# Resolved once; the home directory does not change over the process lifetime
+_HOME = os.path.expanduser("~")
+
+# Compact output keeps json on its C encoder; set PACKAGE_MANAGER_DEBUG=1
+# to get an indented, human-readable configuration file instead
+if os.environ.get("PACKAGE_MANAGER_DEBUG", "") not in ("", "0"):
+    _JSON_DUMP_OPTIONS = {"indent": 2}
+else:
+    _JSON_DUMP_OPTIONS = {"separators": (",", ":")}
+
 
 class PackageManager:
     """
     Package manager for managing multiple versions of the same package
     """
 
+    __slots__ = ('name', 'versions', '_active_version', '_override', 'cache_timeout',
+                 '_lock', '_dirty', '_batch_depth', 'config_path')
+
     def __init__(self, name: str, config_path: str = None, cache_timeout: int = 300):
         """
         Initialize a package manager
@@ -27,24 +40,57 @@ class PackageManager:
         Args:
             name: Name of the package to manage
             config_path: Path to configuration file (default: ~/.{name}_versions.json)
-            cache_timeout: Cache timeout in seconds (default: 5 minutes)
+            cache_timeout: Deprecated and ignored; loaded modules stay cached
+                until a forced reload. Kept for backward compatibility.
         """
         self.name = name
         self.versions: Dict[str, PackageVersion] = {}
-        self.active_version: Optional[str] = None
+        self._active_version: Optional[str] = None
+        # temporary_version() override, kept per thread and per asyncio task
+        self._override: contextvars.ContextVar = contextvars.ContextVar(
+            f"{name}_active_version", default=None
+        )
         self.cache_timeout = cache_timeout
-        self._lock = threading.RLock()
+        # Loading a version runs its module code, which may call back into this
+        # manager; load() and import_module() therefore always run outside the
+        # lock, and the locked sections only publish their results
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._batch_depth = 0
 
         # Set default configuration path
         if config_path is None:
-            home = os.path.expanduser("~")
-            self.config_path = os.path.join(home, f".{name}_versions.json")
+            self.config_path = os.path.join(_HOME, f".{name}_versions.json")
         else:
             self.config_path = config_path
 
+            # Create the parent directory once here rather than failing on every save
+            config_dir = os.path.dirname(config_path)
+            if config_dir:
+                try:
+                    os.makedirs(config_dir, exist_ok=True)
+                except OSError:
+                    # _save_config reports the failure when it tries to write
+                    pass
+
         # Load configuration if exists
         self._load_config()
 
+    @property
+    def active_version(self) -> Optional[str]:
+        """
+        The active version as seen by the calling thread
+
+        Inside a temporary_version() block this is the temporary version, but
+        only for the thread or asyncio task that entered the block.
+        """
+        override = self._override.get()
+        return override if override is not None else self._active_version
+
+    @active_version.setter
+    def active_version(self, version: Optional[str]) -> None:
+        self._active_version = version
+
     def _load_config(self) -> None:
         """Load configuration from file"""
         if os.path.exists(self.config_path):
@@ -72,26 +118,57 @@ class PackageManager:
 
     def _save_config(self) -> None:
         """Save configuration to file"""
+        if self._batch_depth > 0:
+            # Deferred until the outermost batch() block exits
+            self._dirty = True
+            return
+
         config = {
             "name": self.name,
-            "active_version": self.active_version,
-            "versions": []
+            "active_version": self._active_version,
+            "versions": [
+                {
+                    "version": version,
+                    "path": pkg_ver.path,
+                    "is_main": pkg_ver.is_main,
+                    "metadata": pkg_ver.metadata
+                }
+                for version, pkg_ver in self.versions.items()
+            ]
         }
 
-        for version, pkg_ver in self.versions.items():
-            config["versions"].append({
-                "version": version,
-                "path": pkg_ver.path,
-                "is_main": pkg_ver.is_main,
-                "metadata": pkg_ver.metadata
-            })
-
         try:
+            # json.dumps() rather than json.dump(): only the one-shot path
+            # uses the C encoder
+            data = json.dumps(config, **_JSON_DUMP_OPTIONS)
             with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=2)
-        except Exception as e:
+                f.write(data)
+        except (OSError, TypeError, ValueError) as e:
             warnings.warn(f"Failed to save configuration to {self.config_path}: {e}")
 
+    @contextmanager
+    def batch(self):
+        """
+        Group several changes into a single configuration write
+
+        Saves requested inside the block are deferred and the configuration
+        is written once when the outermost batch block exits.
+
+        Yields:
+            The package manager itself
+        """
+        with self._lock:
+            self._batch_depth += 1
+
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self._dirty = False
+                    self._save_config()
+
     def register_main_version(self) -> Optional[PackageVersion]:
         """
         Register the main pip-installed version of the package
@@ -99,32 +176,64 @@ class PackageManager:
         Returns:
             PackageVersion if successful, None if not found
         """
+        try:
+            # Try to find the package in sys.path
+            module = importlib.import_module(self.name)
+        except ImportError:
+            return None
+
+        file_path = getattr(module, "__file__", None)
+        if not file_path:
+            # Fall back to the spec origin, e.g. for frozen modules
+            file_path = getattr(getattr(module, "__spec__", None), "origin", None) or ""
+        path = os.path.dirname(file_path)
+
+        # Try to get version
+        version = getattr(module, "__version__", "main")
+
+        pkg_ver = PackageVersion(
+            name=self.name,
+            version=version,
+            path=path,
+            is_main=True
+        )
+
         with self._lock:
-            try:
-                # Try to find the package in sys.path
-                module = importlib.import_module(self.name)
-                path = os.path.dirname(inspect.getfile(module))
+            self.versions[version] = pkg_ver
 
-                # Try to get version
-                version = getattr(module, "__version__", "main")
+            # If no active version, set this as active
+            if self._active_version is None:
+                self._active_version = version
 
-                pkg_ver = PackageVersion(
-                    name=self.name,
-                    version=version,
-                    path=path,
-                    is_main=True
-                )
+            self._save_config()
+        return pkg_ver
 
-                self.versions[version] = pkg_ver
+    def _create_version(self, version: str, path: str, metadata: Dict[str, Any] = None) -> PackageVersion:
+        """
+        Create and load a PackageVersion to verify it is valid
 
-                # If no active version, set this as active
-                if self.active_version is None:
-                    self.active_version = version
+        Raises:
+            ValueError: If the path does not exist or cannot be loaded
+        """
+        # Check if path exists
+        if not os.path.exists(path):
+            raise ValueError(f"Path does not exist: {path}")
+
+        pkg_ver = PackageVersion(
+            name=self.name,
+            version=version,
+            path=path,
+            is_main=False,
+            metadata=metadata
+        )
+
+        # Try to load to verify it's valid
+        try:
+            pkg_ver.load()
+        except Exception as e:
+            raise ValueError(f"Failed to load package at {path}: {e}")
 
-                self._save_config()
-                return pkg_ver
-            except ImportError:
-                return None
+        return pkg_ver
 
     def register_version(self, version: str, path: str, metadata: Dict[str, Any] = None) -> PackageVersion:
         """
@@ -138,33 +247,44 @@ class PackageManager:
         Returns:
             The registered PackageVersion
         """
-        with self._lock:
-            # Check if path exists
-            if not os.path.exists(path):
-                raise ValueError(f"Path does not exist: {path}")
-
-            pkg_ver = PackageVersion(
-                name=self.name,
-                version=version,
-                path=path,
-                is_main=False,
-                metadata=metadata
-            )
-
-            # Try to load to verify it's valid
-            try:
-                pkg_ver.load()
-            except Exception as e:
-                raise ValueError(f"Failed to load package at {path}: {e}")
+        pkg_ver = self._create_version(version, path, metadata)
 
+        with self._lock:
             self.versions[version] = pkg_ver
 
             # If no active version, set this as active
-            if self.active_version is None:
-                self.active_version = version
+            if self._active_version is None:
+                self._active_version = version
 
             self._save_config()
-            return pkg_ver
+        return pkg_ver
+
+    def register_versions(self, items: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> List[PackageVersion]:
+        """
+        Register several versions of the package at once
+
+        Every version is loaded before any is registered, so a failure
+        leaves the manager unchanged. The configuration is saved once.
+
+        Args:
+            items: (version, path, metadata) tuples; metadata may be None
+
+        Returns:
+            The registered PackageVersions, in the order given
+        """
+        pkg_vers = [self._create_version(version, path, metadata)
+                    for version, path, metadata in items]
+
+        with self._lock:
+            for pkg_ver in pkg_vers:
+                self.versions[pkg_ver.version] = pkg_ver
+
+            # If no active version, make the first new one active
+            if self._active_version is None and pkg_vers:
+                self._active_version = pkg_vers[0].version
+
+            self._save_config()
+        return pkg_vers
 
     def unregister_version(self, version: str) -> bool:
         """
@@ -181,15 +301,13 @@ class PackageManager:
                 return False
 
             # Check if it's the active version
-            if self.active_version == version:
-                # Find another version to make active
-                other_versions = [v for v in self.versions if v != version]
-                if other_versions:
-                    self.active_version = other_versions[0]
-                else:
-                    self.active_version = None
-
-            del self.versions[version]
+            if self._active_version == version:
+                # Make the first other registered version active, if any
+                self._active_version = next((v for v in self.versions if v != version), None)
+
+            # Drop the loaded module everywhere it is held, so it can be
+            # collected and registering the version again re-executes it
+            self.versions.pop(version).unload()
             self._save_config()
             return True
 
@@ -204,12 +322,15 @@ class PackageManager:
             The loaded module
         """
         with self._lock:
-            if version not in self.versions:
+            pkg_ver = self.versions.get(version)
+            if pkg_ver is None:
                 raise VersionNotFoundError(self.name, version)
 
-            self.active_version = version
+            self._active_version = version
             self._save_config()
-            return self.versions[version].load()
+
+        module = pkg_ver._module
+        return module if module is not None else pkg_ver.load()
 
     def get_version(self, version: str = None) -> Any:
         """
@@ -225,48 +346,68 @@ class PackageManager:
         if version is None:
             raise ValueError("No active version set and no version specified")
 
-        if version not in self.versions:
+        pkg_ver = self.versions.get(version)
+        if pkg_ver is None:
             raise VersionNotFoundError(self.name, version)
 
-        return self.versions[version].load()
+        module = pkg_ver._module
+        return module if module is not None else pkg_ver.load()
 
     @contextmanager
     def temporary_version(self, version: str):
         """
         Temporarily use a specific version in a context
 
+        The version is only active for the calling thread or asyncio task;
+        others keep seeing the manager's active version.
+
         Args:
             version: Version to use temporarily
 
         Yields:
             The loaded module
         """
-        if version not in self.versions:
+        pkg_ver = self.versions.get(version)
+        if pkg_ver is None:
             raise VersionNotFoundError(self.name, version)
 
-        with self._lock:
-            old_version = self.active_version
-            self.active_version = version
-
-            try:
-                yield self.versions[version].load()
-            finally:
-                self.active_version = old_version
+        # The override lives in the caller's context, so overlapping blocks in
+        # other threads or tasks neither see it nor restore over it, and the
+        # token restores exactly what this block replaced
+        token = self._override.set(version)
+        try:
+            module = pkg_ver._module
+            yield module if module is not None else pkg_ver.load()
+        finally:
+            self._override.reset(token)
 
     def list_versions(self) -> List[Dict[str, Any]]:
         """
         List all registered versions
 
+        Modules are not loaded; use PackageVersion.get_info() for details
+        read from the module itself.
+
         Returns:
             List of version information dictionaries
         """
-        result = []
-        for version, pkg_ver in self.versions.items():
-            info = pkg_ver.get_info()
-            info["active"] = (version == self.active_version)
-            result.append(info)
+        # Snapshot under the lock so concurrent (un)registration cannot change
+        # the dict mid-iteration; build the result outside it
+        with self._lock:
+            items = list(self.versions.items())
+            active_version = self.active_version
 
-        return result
+        return [
+            {
+                "name": pkg_ver.name,
+                "version": version,
+                "path": pkg_ver.path,
+                "is_main": pkg_ver.is_main,
+                "metadata": pkg_ver.metadata,
+                "active": version == active_version,
+            }
+            for version, pkg_ver in items
+        ]
 
     def get_active_version(self) -> Optional[PackageVersion]:
         """
@@ -287,7 +428,12 @@ class PackageManager:
         Returns:
             The active version module
         """
-        if self.active_version is None:
+        # Lock-free: rebinding active_version is atomic, and a racing miss
+        # only falls through to load(), which is safe to repeat
+        active_version = self.active_version
+        if active_version is None:
             raise ValueError("No active version set")
 
-        return self.versions[self.active_version].load()
\ No newline at end of file
+        pkg_ver = self.versions[active_version]
+        module = pkg_ver._module
+        return module if module is not None else pkg_ver.load()
\ No newline at end of file
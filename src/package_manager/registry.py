@@ -4,11 +4,13 @@ Global registry for package managers
 
 from typing import Dict
 
+from .manager import PackageManager
+
 # Global registry of package managers
-_package_managers: Dict[str, 'PackageManager'] = {}
+_package_managers: Dict[str, PackageManager] = {}
 
 
-def get_package_manager(name: str, **kwargs) -> 'PackageManager':
+def get_package_manager(name: str, **kwargs) -> PackageManager:
     """
     Get or create a package manager for the given package name
 
@@ -19,8 +21,7 @@ def get_package_manager(name: str, **kwargs) -> 'PackageManager':
     Returns:
         A PackageManager instance
     """
-    if name not in _package_managers:
-        # Import here to avoid circular imports
-        from .manager import PackageManager
-        _package_managers[name] = PackageManager(name, **kwargs)
-    return _package_managers[name]
\ No newline at end of file
+    manager = _package_managers.get(name)
+    if manager is None:
+        manager = _package_managers[name] = PackageManager(name, **kwargs)
+    return manager
\ No newline at end of file
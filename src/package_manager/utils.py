@@ -3,6 +3,7 @@ Utility functions for package manager
 """
 
 import warnings
+from functools import wraps
 from typing import Dict, Any, Union
 
 from .registry import get_package_manager
@@ -28,30 +29,28 @@ def setup_package_manager(name: str, register_main: bool = True,
     """
     manager = get_package_manager(name, **kwargs)
 
-    # Register main version if requested
-    if register_main:
-        main_ver = manager.register_main_version()
-        if main_ver is None:
-            warnings.warn(f"Main version of {name} not found in pip packages")
-
-    # Register additional versions
-    if versions:
-        for version, path_or_dict in versions.items():
-            if isinstance(path_or_dict, str):
-                manager.register_version(version, path_or_dict)
+    # Write the configuration once after all registrations
+    with manager.batch():
+        # Register main version if requested
+        if register_main:
+            main_ver = manager.register_main_version()
+            if main_ver is None:
+                warnings.warn(f"Main version of {name} not found in pip packages")
+
+        # Register additional versions
+        if versions:
+            manager.register_versions([
+                (version, path_or_dict, None) if isinstance(path_or_dict, str)
+                else (version, path_or_dict["path"], path_or_dict.get("metadata"))
+                for version, path_or_dict in versions.items()
+            ])
+
+        # Set default version if specified
+        if default_version:
+            if default_version in manager.versions:
+                manager.use_version(default_version)
             else:
-                manager.register_version(
-                    version,
-                    path_or_dict["path"],
-                    metadata=path_or_dict.get("metadata")
-                )
-
-    # Set default version if specified
-    if default_version:
-        if default_version in manager.versions:
-            manager.use_version(default_version)
-        else:
-            warnings.warn(f"Default version {default_version} not found in registered versions")
+                warnings.warn(f"Default version {default_version} not found in registered versions")
 
     return manager
 
@@ -81,15 +80,20 @@ def create_decorator(package_name: str, version: str):
 
     Returns:
         A decorator function
+
+    Raises:
+        VersionNotFoundError: If the version is not registered when the
+            decorator is created
     """
     manager = get_package_manager(package_name)
 
+    # Fail fast at creation time; per call, temporary_version() is the only
+    # lookup, so later (un)registrations are still honoured
     if version not in manager.versions:
         raise VersionNotFoundError(package_name, version)
 
     def decorator(func):
-        import functools
-        @functools.wraps(func)
+        @wraps(func)
         def wrapper(*args, **kwargs):
             with manager.temporary_version(version):
                 return func(*args, **kwargs)
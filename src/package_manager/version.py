@@ -2,19 +2,168 @@
 Module for package version representation
 """
 
+import enum
+import functools
 import importlib
+import importlib.machinery
 import importlib.util
 import os
+import stat
 import sys
 import time
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
-from .exceptions import ImportError
+from .exceptions import PackageImportError
 
 # Setup logging
 logger = logging.getLogger("package_manager")
 
+# Bound once so the path resolution and load paths skip the os.path
+# attribute lookups
+_exists = os.path.exists
+_join = os.path.join
+_dirname = os.path.dirname
+_basename = os.path.basename
+_SEP = os.sep
+
+
+def _stat(path: str):
+    """Return os.stat(path), or None where os.path.exists() would be False"""
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_dir(st) -> bool:
+    """Whether a _stat() result describes a directory"""
+    return st is not None and stat.S_ISDIR(st.st_mode)
+
+
+def _scan_dir(path: str) -> Dict[str, os.DirEntry]:
+    """Map entry names to DirEntry objects for path, or {} if it cannot be read"""
+    try:
+        with os.scandir(path or ".") as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
+
+class _Kind(enum.IntEnum):
+    """Shape of a custom version path, as found by _resolve_module_location()"""
+    DIR_PKG = 1    # package directory; location is its __init__.py
+    FILE_PY = 2    # single module; location is the .py file
+    BARE_NAME = 3  # nothing on disk matched; import the basename from its parent
+
+
+def _file_spec(spec_name: str, location: str):
+    """Build a spec for an __init__.py or module file"""
+    return importlib.util.spec_from_file_location(spec_name, location)
+
+
+def _finder_spec(spec_name: str, location: str):
+    """
+    Find the basename of location in its parent directory only
+
+    Restricting the search to the parent directory leaves sys.path, and with
+    it every cached path finder, untouched. The spec found is rebuilt under
+    spec_name, so the module never takes the place of an installed package
+    of the same name in sys.modules.
+    """
+    found = importlib.machinery.PathFinder.find_spec(
+        _basename(location),
+        [_dirname(location) or "."]
+    )
+    if found is None or found.origin is None:
+        # Nothing found, or a namespace package with no file to load
+        return None
+
+    return importlib.util.spec_from_file_location(
+        spec_name,
+        found.origin,
+        submodule_search_locations=found.submodule_search_locations
+    )
+
+
+_SPEC_BUILDERS = {
+    _Kind.DIR_PKG: _file_spec,
+    _Kind.FILE_PY: _file_spec,
+    _Kind.BARE_NAME: _finder_spec,
+}
+
+
+@functools.lru_cache(maxsize=512)
+def _resolve_module_location(path: str) -> Tuple[_Kind, str]:
+    """
+    Work out which file a custom version path should be loaded from
+
+    The result depends only on the filesystem layout under ``path``, so it is
+    memoized; call PackageVersion.invalidate_path_cache() if that layout
+    changes.
+
+    Args:
+        path: Path given for the package version
+
+    Returns:
+        (_Kind.DIR_PKG, init_path) for a package directory,
+        (_Kind.FILE_PY, file_path) for a single module file, or
+        (_Kind.BARE_NAME, path) when nothing matches and the basename should
+        be imported by name
+
+    Raises:
+        PackageImportError: If path is a directory without an __init__.py
+    """
+    # One stat per candidate path answers every exists/isdir question below
+    st = _stat(path)
+    if _is_dir(st):
+        # Path is an existing directory
+        # path is a non-empty directory name, so plain concatenation gives
+        # the same result as os.path.join without its pure-Python overhead
+        sep = "" if path.endswith(_SEP) else _SEP
+        init_path = f"{path}{sep}__init__.py"
+        init_st = _stat(init_path)
+        logger.debug("Looking for __init__.py at: %s (exists: %s)",
+                     init_path, init_st is not None)
+
+        # Verify __init__.py file exists
+        if init_st is None:
+            raise PackageImportError(f"No __init__.py found at {init_path}")
+
+        return _Kind.DIR_PKG, init_path
+
+    if _stat(f"{path}.py") is not None:
+        # Path is a file without .py extension
+        logger.debug("Found module file at: %s.py", path)
+        return _Kind.FILE_PY, f"{path}.py"
+
+    if st is not None and path.endswith(".py"):
+        # Path is a file with .py extension
+        logger.debug("Using module file: %s", path)
+        return _Kind.FILE_PY, path
+
+    # One directory scan answers both sibling probes below
+    parent, base = _dirname(path), _basename(path)
+    entries = _scan_dir(parent)
+
+    entry = entries.get(f"{base}.py")
+    if entry is not None and entry.is_file():
+        # Path might be part of directory name, try to treat it as a filename
+        file_path = _join(parent, f"{base}.py")
+        logger.debug("Found module file in parent directory: %s", file_path)
+        return _Kind.FILE_PY, file_path
+
+    entry = entries.get(base)
+    if entry is not None and entry.is_dir():
+        init_path = _join(parent, base, "__init__.py")
+        if _stat(init_path) is not None:
+            # Path might be a parent directory containing __init__.py
+            logger.debug("Found __init__.py in subdirectory: %s", init_path)
+            return _Kind.DIR_PKG, init_path
+
+    return _Kind.BARE_NAME, path
+
+
 class PackageVersion:
     """Represents a single package version"""
 
@@ -37,6 +186,31 @@ class PackageVersion:
         self.metadata = metadata or {}
         self._module = None
         self._last_loaded = 0
+        self._info_cache = None
+
+    @staticmethod
+    def invalidate_path_cache() -> None:
+        """
+        Forget how version paths were resolved
+
+        Path resolution is cached for the life of the process, so a version
+        whose files are moved, created or removed after its first load keeps
+        resolving to the old location until this is called.
+        """
+        _resolve_module_location.cache_clear()
+
+    def unload(self) -> None:
+        """
+        Forget the loaded module and the info read from it
+
+        A custom version is also removed from sys.modules, so loading the
+        same path again runs its module code afresh. The main version is
+        left in place, as other importers share it.
+        """
+        if not self.is_main:
+            sys.modules.pop(f"{self.name}_{self.version}", None)
+        self._module = None
+        self._info_cache = None
 
     def __repr__(self) -> str:
         return f"<PackageVersion {self.name}:{self.version} {'(main)' if self.is_main else ''}>"
@@ -51,10 +225,13 @@ class PackageVersion:
         Returns:
             The loaded module
         """
-        now = time.time()
-        if self._module is not None and not force and (now - self._last_loaded) < 300:  # 5 min cache
+        # A loaded module stays cached until a forced reload
+        if self._module is not None and not force:
             return self._module
 
+        # Module attributes reported by get_info() may change with the reload
+        self._info_cache = None
+
         if self.is_main:
             try:
                 if self._module is not None and force:
@@ -66,126 +243,90 @@ class PackageVersion:
 
                 self._module = importlib.import_module(self.name)
             except Exception as e:
-                raise ImportError(f"Failed to import main package {self.name}: {e}")
+                raise PackageImportError(f"Failed to import main package {self.name}: {e}") from e
         else:
+            # Diagnostics below stat the filesystem, so only gather them when
+            # someone will see them
+            debug = logger.isEnabledFor(logging.DEBUG)
             try:
                 # Debug information about the path being processed
-                logger.debug(f"Loading package {self.name} version {self.version} from path: {self.path}")
-                logger.debug(f"Path exists: {os.path.exists(self.path)}")
-                logger.debug(f"Path is directory: {os.path.isdir(self.path)}")
-
-                # Comprehensive check if path is directory or file
-                if os.path.exists(self.path) and os.path.isdir(self.path):
-                    # Path is an existing directory
-                    init_path = os.path.join(self.path, "__init__.py")
-                    logger.debug(f"Looking for __init__.py at: {init_path}")
-                    logger.debug(f"__init__.py exists: {os.path.exists(init_path)}")
-
-                    # Verify __init__.py file exists
-                    if not os.path.exists(init_path):
-                        raise ImportError(f"No __init__.py found at {init_path}")
-
-                    spec = importlib.util.spec_from_file_location(
-                        f"{self.name}_{self.version}",
-                        init_path
-                    )
-
-                    if spec is None:
-                        raise ImportError(f"Could not create module spec from {init_path}")
-
-                elif os.path.exists(f"{self.path}.py"):
-                    # Path is a file without .py extension
-                    logger.debug(f"Found module file at: {self.path}.py")
-                    spec = importlib.util.spec_from_file_location(
-                        f"{self.name}_{self.version}",
-                        f"{self.path}.py"
-                    )
-
-                    if spec is None:
-                        raise ImportError(f"Could not create module spec from {self.path}.py")
+                if debug:
+                    st = _stat(self.path)
+                    logger.debug("Loading package %s version %s from path: %s "
+                                 "(exists: %s, is directory: %s)",
+                                 self.name, self.version, self.path,
+                                 st is not None, _is_dir(st))
 
-                elif os.path.exists(self.path) and self.path.endswith(".py"):
-                    # Path is a file with .py extension
-                    logger.debug(f"Using module file: {self.path}")
-                    spec = importlib.util.spec_from_file_location(
-                        f"{self.name}_{self.version}",
-                        self.path
-                    )
+                kind, location = _resolve_module_location(self.path)
 
-                    if spec is None:
-                        raise ImportError(f"Could not create module spec from {self.path}")
+                if kind is _Kind.BARE_NAME:
+                    logger.debug("Trying to import as package: %s", self.name)
 
-                elif os.path.exists(os.path.join(os.path.dirname(self.path), f"{os.path.basename(self.path)}.py")):
-                    # Path might be part of directory name, try to treat it as a filename
-                    file_path = os.path.join(os.path.dirname(self.path), f"{os.path.basename(self.path)}.py")
-                    logger.debug(f"Found module file in parent directory: {file_path}")
-                    spec = importlib.util.spec_from_file_location(
-                        f"{self.name}_{self.version}",
-                        file_path
-                    )
+                spec = _SPEC_BUILDERS[kind](f"{self.name}_{self.version}", location)
 
-                    if spec is None:
-                        raise ImportError(f"Could not create module spec from {file_path}")
+                if spec is None and kind is _Kind.BARE_NAME:
+                    # List directory contents for debugging
+                    if debug:
+                        try:
+                            parent = _dirname(self.path)
+                            if _exists(parent):
+                                logger.debug("Contents of parent directory %s: %s",
+                                             parent, os.listdir(parent))
+                            if _exists(self.path):
+                                logger.debug("Contents of directory %s: %s",
+                                             self.path, os.listdir(self.path))
+                        except Exception as list_err:
+                            logger.debug("Failed to list directory contents: %s", list_err)
 
-                elif os.path.exists(os.path.join(os.path.dirname(self.path), os.path.basename(self.path), "__init__.py")):
-                    # Path might be a parent directory containing __init__.py
-                    init_path = os.path.join(os.path.dirname(self.path), os.path.basename(self.path), "__init__.py")
-                    logger.debug(f"Found __init__.py in subdirectory: {init_path}")
-                    spec = importlib.util.spec_from_file_location(
-                        f"{self.name}_{self.version}",
-                        init_path
+                    raise PackageImportError.for_path(
+                        self.path, "Could not find valid module or package"
                     )
 
-                    if spec is None:
-                        raise ImportError(f"Could not create module spec from {init_path}")
-
-                else:
-                    # Try to import as package directly
-                    logger.debug(f"Trying to import as package: {self.name}")
-                    try:
-                        package_name = os.path.basename(self.path)
-                        sys.path.insert(0, os.path.dirname(self.path))
-                        self._module = importlib.import_module(package_name)
-                        sys.path.pop(0)
-                        self._last_loaded = now
-                        return self._module
-                    except Exception as e:
-                        # List directory contents for debugging
-                        try:
-                            if os.path.exists(os.path.dirname(self.path)):
-                                logger.debug(f"Contents of parent directory {os.path.dirname(self.path)}: {os.listdir(os.path.dirname(self.path))}")
-                            if os.path.exists(self.path):
-                                logger.debug(f"Contents of directory {self.path}: {os.listdir(self.path)}")
-                        except Exception as list_err:
-                            logger.debug(f"Failed to list directory contents: {list_err}")
+                if spec is None:
+                    raise PackageImportError(f"Could not create module spec from {location}")
 
-                        raise ImportError(
-                            f"Could not find valid module or package at {self.path}. "
-                            f"Path exists: {os.path.exists(self.path)}. "
-                            f"Path is directory: {os.path.isdir(self.path) if os.path.exists(self.path) else 'N/A'}. "
-                            f"Import error: {e}"
-                        )
+                # Another instance may already have executed this module from
+                # the same file; only a forced reload runs its top-level code again
+                module = sys.modules.get(spec.name)
+                if (module is not None and not force
+                        and getattr(module, "__file__", None) == spec.origin):
+                    self._module = module
+                    self._last_loaded = time.time()
+                    return module
 
                 # Load module using spec
                 module = importlib.util.module_from_spec(spec)
                 # Add module to sys.modules to handle relative imports
                 sys.modules[spec.name] = module
-                spec.loader.exec_module(module)
+                try:
+                    spec.loader.exec_module(module)
+                except BaseException:
+                    # As importlib does, drop the half-executed module so the
+                    # reuse check above can never hand it out
+                    sys.modules.pop(spec.name, None)
+                    raise
                 self._module = module
 
             except Exception as e:
-                # Detailed error information
-                error_msg = f"Failed to import package {self.name} version {self.version} from {self.path}: {e}"
-                logger.error(error_msg)
-                logger.error(f"Path exists: {os.path.exists(self.path)}")
-                if os.path.exists(self.path) and os.path.isdir(self.path):
-                    logger.error(f"Directory content: {os.listdir(self.path)}")
-                    init_file = os.path.join(self.path, "__init__.py")
-                    logger.error(f"__init__.py exists: {os.path.exists(init_file)}")
-
-                raise ImportError(error_msg)
-
-        self._last_loaded = now
+                # Detailed error information; the caller decides whether to
+                # report the error, so it is only rendered here for debugging
+                error = PackageImportError(
+                    f"Failed to import package {self.name} version {self.version} from {self.path}",
+                    detail=e
+                )
+                if debug:
+                    logger.debug("%s", error)
+                    st = _stat(self.path)
+                    if _is_dir(st):
+                        init_file = _join(self.path, "__init__.py")
+                        logger.debug("Directory content: %s (__init__.py exists: %s)",
+                                     os.listdir(self.path), _exists(init_file))
+                    else:
+                        logger.debug("Path exists: %s", st is not None)
+
+                raise error from e
+
+        self._last_loaded = time.time()
         return self._module
 
     def get_info(self) -> Dict[str, Any]:
@@ -195,6 +336,9 @@ class PackageVersion:
         Returns:
             Dict with package information
         """
+        if self._info_cache is not None:
+            return dict(self._info_cache)
+
         info = {
             "name": self.name,
             "version": self.version,
@@ -213,7 +357,10 @@ class PackageVersion:
             if hasattr(module, "__doc__"):
                 info["doc"] = module.__doc__
         except Exception:
-            # Ignore errors when trying to get additional info
-            pass
+            # Ignore errors when trying to get additional info; nothing is
+            # cached so a later call can try again
+            return info
 
+        # Copy on the way in and out so callers cannot alter the cache
+        self._info_cache = dict(info)
         return info
\ No newline at end of file
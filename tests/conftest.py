@@ -5,4 +5,12 @@ import os
 import sys
 
 # Add the src directory to the path so we can import the package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import every submodule once up front, so each pytest-xdist worker pays the
+# import cost before collection rather than in whichever test module is first
+import src.package_manager.exceptions
+import src.package_manager.version
+import src.package_manager.manager
+import src.package_manager.registry
+import src.package_manager.utils
\ No newline at end of file
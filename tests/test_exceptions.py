@@ -1,13 +1,15 @@
 """
 Tests for the exceptions module.
 """
+import os
+import pickle
 import pytest
 
 from src.package_manager.exceptions import (
     PackageManagerError,
     PackageNotFoundError,
     VersionNotFoundError,
-    ImportError,
+    PackageImportError,
     ConfigError
 )
 
@@ -37,11 +39,40 @@ class TestExceptions:
         assert isinstance(error, PackageManagerError)
 
     def test_import_error(self):
-        """Test ImportError"""
-        error = ImportError("Failed to import module")
+        """Test PackageImportError"""
+        error = PackageImportError("Failed to import module")
         assert str(error) == "Failed to import module"
         assert isinstance(error, PackageManagerError)
 
+    def test_import_error_for_path(self, tmp_path):
+        """Test PackageImportError.for_path describes the path as it was when created"""
+        missing = str(tmp_path / "missing")
+        error = PackageImportError.for_path(missing, "Could not load")
+        assert error.path == missing
+        assert str(error) == (f"Could not load at {missing}. "
+                              "Path exists: False. Path is directory: N/A.")
+
+        # Later changes on disk do not alter the message
+        os.makedirs(missing)
+        assert str(error).endswith("Path exists: False. Path is directory: N/A.")
+        assert str(PackageImportError.for_path(missing, "Could not load")).endswith(
+            "Path exists: True. Path is directory: True.")
+
+    def test_import_error_detail(self):
+        """Test PackageImportError appends its detail when rendered"""
+        error = PackageImportError("Failed to import module", detail=ValueError("boom"))
+        assert str(error) == "Failed to import module: boom"
+
+    def test_import_error_pickles(self, tmp_path):
+        """Test PackageImportError keeps its path and detail through pickling"""
+        missing = str(tmp_path / "missing")
+        error = PackageImportError.for_path(missing, "Could not load")
+        error.detail = ValueError("boom")
+
+        restored = pickle.loads(pickle.dumps(error))
+        assert restored.path == missing
+        assert str(restored) == str(error)
+
     def test_config_error(self):
         """Test ConfigError"""
         error = ConfigError("Invalid configuration")
@@ -53,10 +84,10 @@ class TestExceptions:
         # All should inherit from PackageManagerError
         assert issubclass(PackageNotFoundError, PackageManagerError)
         assert issubclass(VersionNotFoundError, PackageManagerError)
-        assert issubclass(ImportError, PackageManagerError)
+        assert issubclass(PackageImportError, PackageManagerError)
         assert issubclass(ConfigError, PackageManagerError)
 
         # Should not inherit from each other
         assert not issubclass(PackageNotFoundError, VersionNotFoundError)
-        assert not issubclass(VersionNotFoundError, ImportError)
-        assert not issubclass(ImportError, ConfigError)
\ No newline at end of file
+        assert not issubclass(VersionNotFoundError, PackageImportError)
+        assert not issubclass(PackageImportError, ConfigError)
\ No newline at end of file
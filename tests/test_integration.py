@@ -1,111 +1,170 @@
 """
 Integration tests for package_manager.
 Uses installed packages and downloads additional versions from PyPI.
+
+The tests can run in parallel under pytest-xdist (pytest -n auto). Each
+test manages a different package, so the only state they share is the
+download cache, which tolerates concurrent extraction. The package manager
+registry lives in each worker's own process.
 """
-import importlib
+import functools
+import heapq
+import importlib.metadata
 import os
+import shutil
 import subprocess
 import sys
-import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
-import pkg_resources
 import pytest
 import requests
+from packaging.version import InvalidVersion, Version
+from requests.adapters import HTTPAdapter
 
 # Import package_manager components
 from src.package_manager import setup_package_manager, import_version, create_decorator
 
 
-class TestIntegration:
-    """Integration tests using real packages"""
-
-    @pytest.fixture(scope="module")
-    def package_cache(self):
-        """Fixture to prepare package cache directory"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            yield temp_dir
-
-    def get_installed_version(self, package_name):
-        """Get the installed version of a package"""
-        try:
-            module = importlib.import_module(package_name)
-            if hasattr(module, '__version__'):
-                return module.__version__
+# Distribution names for import names that differ from them
+_DISTRIBUTION_NAMES = {'yaml': 'PyYAML'}
+
+
+@functools.lru_cache(maxsize=None)
+def get_installed_version(package_name):
+    """Get the installed version of a package without importing it"""
+    try:
+        return importlib.metadata.version(_DISTRIBUTION_NAMES.get(package_name, package_name))
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_available_versions(session, package_name, limit=5):
+    """Get available versions of a package from PyPI, newest first"""
+    try:
+        # Query PyPI JSON API
+        url = f"https://pypi.org/pypi/{package_name}/json"
+        response = session.get(url)
+        response.raise_for_status()
+        data = response.json()
+
+        # Keep final releases that have files; string order would put 2.9
+        # above 2.10 and let pre-releases through
+        parsed = {}
+        for version, files in data["releases"].items():
+            try:
+                parsed_version = Version(version)
+            except InvalidVersion:
+                continue
+            if files and not parsed_version.is_prerelease:
+                parsed[version] = parsed_version
+
+        # Only the most recent ones are needed, so avoid sorting them all. A
+        # tuple, so the cached result cannot be changed by a caller
+        return tuple(heapq.nlargest(limit, parsed, key=parsed.__getitem__))
+    except Exception as e:
+        pytest.skip(f"Could not fetch versions for {package_name}: {e}")
+        return ()
+
+
+@pytest.fixture(scope="session")
+def pypi_session():
+    """Fixture providing one pooled HTTP session for every PyPI query"""
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        session.mount("https://", adapter)
+        yield session
+
+
+@pytest.fixture(scope="session")
+def package_cache():
+    """
+    Fixture to prepare package cache directory
+
+    Downloads are kept between runs. Set PMGR_TEST_CACHE to use a different
+    directory, e.g. a volume that CI keeps warm.
+    """
+    cache_dir = os.environ.get("PMGR_TEST_CACHE")
+    if not cache_dir:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        cache_dir = os.path.join(cache_home, "package_manager_tests")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
 
-            # Try using pkg_resources if __version__ attribute is not available
-            return pkg_resources.get_distribution(package_name).version
-        except (ImportError, pkg_resources.DistributionNotFound):
-            return None
 
-    def get_available_versions(self, package_name, limit=5):
-        """Get available versions of a package from PyPI"""
-        try:
-            # Query PyPI JSON API
-            url = f"https://pypi.org/pypi/{package_name}/json"
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-
-            # Get all version numbers and sort them
-            versions = list(data["releases"].keys())
-            # Sort versions (this is a simple sort, ideally would use packaging.version)
-            versions.sort(reverse=True)
-
-            return versions[:limit]  # Return only the most recent ones
-        except Exception as e:
-            pytest.skip(f"Could not fetch versions for {package_name}: {e}")
-            return []
+class TestIntegration:
+    """Integration tests using real packages"""
 
     def download_package(self, package_name, version, cache_dir):
         """Download a package from PyPI using pip"""
         download_dir = os.path.join(cache_dir, f"{package_name}-{version}")
         os.makedirs(download_dir, exist_ok=True)
 
-        # Use pip to download the wheel
         try:
-            subprocess.run(
-                [
-                    sys.executable,
-                    "-m",
-                    "pip",
-                    "download",
-                    "--no-deps",
-                    "--only-binary=:all:",
-                    "--dest",
-                    download_dir,
-                    f"{package_name}=={version}"
-                ],
-                check=True,
-                capture_output=True
-            )
-
-            # Find the downloaded wheel
+            # Wheels from an earlier run are reused as they are
             wheel_files = [f for f in os.listdir(download_dir) if f.endswith('.whl')]
             if not wheel_files:
-                pytest.skip(f"Could not find wheel for {package_name} {version}")
-                return None
+                # Use pip to download the wheel
+                subprocess.run(
+                    [
+                        sys.executable,
+                        "-m",
+                        "pip",
+                        "download",
+                        "--no-deps",
+                        "--only-binary=:all:",
+                        "--dest",
+                        download_dir,
+                        f"{package_name}=={version}"
+                    ],
+                    check=True,
+                    capture_output=True
+                )
+
+                # Find the downloaded wheel
+                wheel_files = [f for f in os.listdir(download_dir) if f.endswith('.whl')]
+                if not wheel_files:
+                    pytest.skip(f"Could not find wheel for {package_name} {version}")
+                    return None
 
             wheel_path = os.path.join(download_dir, wheel_files[0])
 
-            # Extract the wheel
+            # Extract the wheel once; extracting next to the final directory
+            # and renaming keeps an interrupted run from leaving it half full
             extract_path = os.path.join(download_dir, "extracted")
-            os.makedirs(extract_path, exist_ok=True)
-
-            with zipfile.ZipFile(wheel_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_path)
-
-            # Find the actual package directory
-            for root, dirs, files in os.walk(extract_path):
-                if os.path.basename(root) == package_name:
-                    if '__init__.py' in files:
-                        return root
-
-            # If not found directly, look for .dist-info directory and search nearby
-            for item in os.listdir(extract_path):
-                if item.endswith('.dist-info'):
-                    if os.path.exists(os.path.join(extract_path, package_name)):
-                        return os.path.join(extract_path, package_name)
+            if not os.path.isdir(extract_path):
+                # Per process, so pytest-xdist workers never share one
+                partial_path = f"{extract_path}.partial-{os.getpid()}"
+                shutil.rmtree(partial_path, ignore_errors=True)
+                with zipfile.ZipFile(wheel_path, 'r') as zip_ref:
+                    # Only importable code is needed, not the wheel metadata
+                    members = [
+                        name for name in zip_ref.namelist()
+                        if not name.endswith('/')
+                        and not name.split('/', 1)[0].endswith(('.dist-info', '.data'))
+                    ]
+                    zip_ref.extractall(partial_path, members=members)
+                try:
+                    os.replace(partial_path, extract_path)
+                except OSError:
+                    # Another worker finished the same extraction first
+                    shutil.rmtree(partial_path, ignore_errors=True)
+
+            # Wheels put the package at the top of the archive
+            package_dir = os.path.join(extract_path, package_name)
+            if os.path.isfile(os.path.join(package_dir, "__init__.py")):
+                return package_dir
+
+            # The import name may differ from the distribution name (pyyaml
+            # ships yaml), so fall back to the first public top-level package
+            with os.scandir(extract_path) as entries:
+                names = sorted(entry.name for entry in entries
+                               if entry.is_dir() and not entry.name.startswith('_'))
+            for name in names:
+                package_dir = os.path.join(extract_path, name)
+                if os.path.isfile(os.path.join(package_dir, "__init__.py")):
+                    return package_dir
 
             pytest.skip(f"Could not locate package directory for {package_name} {version}")
             return None
@@ -114,17 +173,33 @@ class TestIntegration:
             pytest.skip(f"Failed to download {package_name} {version}: {e.stderr.decode()}")
             return None
 
-    def test_yaml_version_management(self, package_cache):
+    def download_packages(self, package_name, versions, cache_dir):
+        """Download several versions of a package concurrently"""
+        # pip runs in a subprocess, so the downloads overlap freely
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                version: executor.submit(self.download_package, package_name, version, cache_dir)
+                for version in versions
+            }
+
+        version_paths = {}
+        for version, future in futures.items():
+            path = future.result()
+            if path:
+                version_paths[version] = path
+        return version_paths
+
+    def test_yaml_version_management(self, pypi_session, package_cache):
         """Test version management with PyYAML"""
         # Check if PyYAML is installed
-        installed_version = self.get_installed_version('yaml')
+        installed_version = get_installed_version('yaml')
         if not installed_version:
             pytest.skip("PyYAML is not installed, skipping test")
 
         print(f"Installed PyYAML version: {installed_version}")
 
         # Get available versions and select two different from installed
-        available_versions = self.get_available_versions('pyyaml')
+        available_versions = get_available_versions(pypi_session, 'pyyaml')
         test_versions = []
 
         for version in available_versions:
@@ -137,11 +212,7 @@ class TestIntegration:
             pytest.skip("Could not find additional PyYAML versions to test")
 
         # Download the test versions
-        version_paths = {}
-        for version in test_versions:
-            path = self.download_package('pyyaml', version, package_cache)
-            if path:
-                version_paths[version] = path
+        version_paths = self.download_packages('pyyaml', test_versions, package_cache)
 
         if not version_paths:
             pytest.skip("Could not download any PyYAML versions")
@@ -161,8 +232,9 @@ class TestIntegration:
             "Main PyYAML version not correctly registered"
 
         # Verify additional versions are registered
+        registered = {v["version"] for v in versions}
         for version in version_paths:
-            assert any(v["version"] == version for v in versions), \
+            assert version in registered, \
                 f"Version {version} not registered correctly"
 
         # Test using each version
@@ -194,17 +266,17 @@ class TestIntegration:
         assert yaml_manager.active_version == installed_version
         assert yaml_manager() == main_yaml
 
-    def test_requests_version_management(self, package_cache):
+    def test_requests_version_management(self, pypi_session, package_cache):
         """Test version management with requests"""
         # Check if requests is installed
-        installed_version = self.get_installed_version('requests')
+        installed_version = get_installed_version('requests')
         if not installed_version:
             pytest.skip("requests is not installed, skipping test")
 
         print(f"Installed requests version: {installed_version}")
 
         # Get available versions and select one different from installed
-        available_versions = self.get_available_versions('requests')
+        available_versions = get_available_versions(pypi_session, 'requests')
         test_versions = []
 
         for version in available_versions:
@@ -217,11 +289,7 @@ class TestIntegration:
             pytest.skip("Could not find additional requests versions to test")
 
         # Download test version
-        version_paths = {}
-        for version in test_versions:
-            path = self.download_package('requests', version, package_cache)
-            if path:
-                version_paths[version] = path
+        version_paths = self.download_packages('requests', test_versions, package_cache)
 
         if not version_paths:
             pytest.skip("Could not download any requests versions")
@@ -238,8 +306,9 @@ class TestIntegration:
         assert any(v["is_main"] and v["version"] == installed_version for v in versions), \
             "Main requests version not correctly registered"
 
+        registered = {v["version"] for v in versions}
         for version in version_paths:
-            assert any(v["version"] == version for v in versions), \
+            assert version in registered, \
                 f"Version {version} not registered correctly"
 
         # Test decorator
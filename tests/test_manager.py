@@ -1,103 +1,169 @@
 """
 Tests for the PackageManager class.
 """
+import asyncio
 import os
+import sys
 import json
-import tempfile
+import threading
+import warnings
 import pytest
-from unittest.mock import patch, MagicMock
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch, mock_open
 
 from src.package_manager.manager import PackageManager
 from src.package_manager.version import PackageVersion
 from src.package_manager.exceptions import VersionNotFoundError
 
 
+@contextmanager
+def _stub(obj, name, value):
+    """Shadow a method on one instance so it returns value inside the block"""
+    obj.__dict__[name] = lambda *args, **kwargs: value
+    try:
+        yield
+    finally:
+        del obj.__dict__[name]
+
+
+@contextmanager
+def _stub_raising(obj, name, error):
+    """Shadow a method on one instance so it raises error inside the block"""
+    def fail(*args, **kwargs):
+        raise error
+
+    obj.__dict__[name] = fail
+    try:
+        yield
+    finally:
+        del obj.__dict__[name]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Fixture providing an empty requests manager with its own config file"""
+    return PackageManager("requests", config_path=str(tmp_path / "requests_versions.json"))
+
+
+@pytest.fixture
+def versions():
+    """Fixture providing a main and an alternative requests version"""
+    return (
+        PackageVersion("requests", "2.25.1", "/path/1", is_main=True),
+        PackageVersion("requests", "2.26.0", "/path/2", is_main=False),
+    )
+
+
 class TestPackageManager:
     """Tests for PackageManager class"""
 
-    def test_init(self):
+    def test_init(self, tmp_path):
         """Test initialization"""
-        with tempfile.NamedTemporaryFile() as temp_file:
-            manager = PackageManager("requests", config_path=temp_file.name)
-
-            assert manager.name == "requests"
-            assert manager.config_path == temp_file.name
-            assert manager.versions == {}
-            assert manager.active_version is None
-            assert manager.cache_timeout == 300
-
-    def test_load_save_config(self):
-        """Test loading and saving configuration"""
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            # Create a test configuration
-            config = {
-                "name": "requests",
-                "active_version": "2.25.1",
-                "versions": [
-                    {
-                        "version": "2.25.1",
-                        "path": "/path/to/requests",
-                        "is_main": True,
-                        "metadata": {"key": "value"}
-                    }
-                ]
-            }
-            temp_file.write(json.dumps(config).encode('utf-8'))
-            temp_file.flush()
-
-            # Test loading
-            manager = PackageManager("requests", config_path=temp_file.name)
-            assert "2.25.1" in manager.versions
-            assert manager.active_version == "2.25.1"
-            assert manager.versions["2.25.1"].path == "/path/to/requests"
-            assert manager.versions["2.25.1"].is_main is True
-            assert manager.versions["2.25.1"].metadata == {"key": "value"}
-
-            # Test saving
-            manager.versions["2.26.0"] = PackageVersion(
-                "requests",
-                "2.26.0",
-                "/path/to/new/requests",
-                is_main=False
-            )
-            manager.active_version = "2.26.0"
+        config_path = str(tmp_path / "requests_versions.json")
+        manager = PackageManager("requests", config_path=config_path)
+
+        assert manager.name == "requests"
+        assert manager.config_path == config_path
+        assert manager.versions == {}
+        assert manager.active_version is None
+        assert manager.cache_timeout == 300
+        assert not hasattr(manager, "__dict__")
+
+    def test_save_config_creates_directory(self, tmp_path):
+        """Test that a missing config directory is created up front"""
+        config_path = tmp_path / "nested" / "dir" / "config.json"
+        manager = PackageManager("requests", config_path=str(config_path))
+
+        assert config_path.parent.is_dir()
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
             manager._save_config()
 
-            # Verify new config
-            with open(temp_file.name, 'r') as f:
-                saved_config = json.load(f)
+        assert json.loads(config_path.read_text())["name"] == "requests"
+
+    def test_load_config(self, tmp_path):
+        """Test loading configuration"""
+        # Create a test configuration
+        config = {
+            "name": "requests",
+            "active_version": "2.25.1",
+            "versions": [
+                {
+                    "version": "2.25.1",
+                    "path": "/path/to/requests",
+                    "is_main": True,
+                    "metadata": {"key": "value"}
+                }
+            ]
+        }
+
+        config_path = tmp_path / "requests_versions.json"
+        config_path.write_text(json.dumps(config))
+        manager = PackageManager("requests", config_path=str(config_path))
+
+        assert "2.25.1" in manager.versions
+        assert manager.active_version == "2.25.1"
+        assert manager.versions["2.25.1"].path == "/path/to/requests"
+        assert manager.versions["2.25.1"].is_main is True
+        assert manager.versions["2.25.1"].metadata == {"key": "value"}
+
+    def test_save_config(self, manager):
+        """Test saving configuration"""
+        manager.versions["2.25.1"] = PackageVersion(
+            "requests", "2.25.1", "/path/to/requests", is_main=True, metadata={"key": "value"}
+        )
+        manager.versions["2.26.0"] = PackageVersion(
+            "requests", "2.26.0", "/path/to/new/requests", is_main=False
+        )
+        manager.active_version = "2.26.0"
+
+        # Only the manager module's open() is replaced, so nothing is written
+        mock_file = mock_open()
+        with patch("src.package_manager.manager.open", mock_file, create=True):
+            manager._save_config()
 
-            assert saved_config["active_version"] == "2.26.0"
-            assert len(saved_config["versions"]) == 2
-            assert any(v["version"] == "2.26.0" for v in saved_config["versions"])
+        # Verify new config
+        mock_file.assert_called_once_with(manager.config_path, 'w')
+        saved_config = json.loads("".join(
+            call.args[0] for call in mock_file().write.call_args_list
+        ))
 
-        # Clean up
-        os.unlink(temp_file.name)
+        assert saved_config["name"] == "requests"
+        assert saved_config["active_version"] == "2.26.0"
+        assert len(saved_config["versions"]) == 2
+        assert "2.26.0" in {v["version"] for v in saved_config["versions"]}
+        assert saved_config["versions"][0]["metadata"] == {"key": "value"}
 
-    def test_register_main_version(self):
+    def test_register_main_version(self, tmp_path):
         """Test registering main version"""
-        manager = PackageManager("pytest")
+        manager = PackageManager("pytest", config_path=str(tmp_path / "pytest_versions.json"))
 
         # Mock importlib.import_module
-        mock_module = MagicMock()
-        mock_module.__version__ = "7.0.0"
-
-        with patch('inspect.getfile', return_value="/path/to/pytest/__init__.py"):
-            with patch('importlib.import_module', return_value=mock_module):
-                result = manager.register_main_version()
-
-                assert result is not None
-                assert result.name == "pytest"
-                assert result.version == "7.0.0"
-                assert result.path == "/path/to/pytest"
-                assert result.is_main is True
-                assert "7.0.0" in manager.versions
-                assert manager.active_version == "7.0.0"
-
-    def test_unregister_version(self):
-        """Test unregistering a version"""
-        manager = PackageManager("requests")
+        mock_module = SimpleNamespace(__version__="7.0.0", __file__="/path/to/pytest/__init__.py")
+
+        with patch('importlib.import_module', return_value=mock_module):
+            result = manager.register_main_version()
+
+            assert result is not None
+            assert result.name == "pytest"
+            assert result.version == "7.0.0"
+            assert result.path == "/path/to/pytest"
+            assert result.is_main is True
+            assert "7.0.0" in manager.versions
+            assert manager.active_version == "7.0.0"
+
+    def test_register_main_version_not_installed(self, manager):
+        """Test that a missing main package yields None instead of raising"""
+        with patch('importlib.import_module', side_effect=ModuleNotFoundError("No module named 'requests'")):
+            assert manager.register_main_version() is None
+
+        assert manager.versions == {}
+        assert manager.active_version is None
 
+    def test_unregister_version(self, manager):
+        """Test unregistering a version"""
         # Add some test versions
         manager.versions["2.25.1"] = PackageVersion("requests", "2.25.1", "/path/1", is_main=True)
         manager.versions["2.26.0"] = PackageVersion("requests", "2.26.0", "/path/2", is_main=False)
@@ -119,45 +185,56 @@ class TestPackageManager:
         result = manager.unregister_version("nonexistent")
         assert result is False
 
-    def test_use_version(self):
+    def test_use_version(self, versions, manager):
         """Test setting and loading active version"""
-        manager = PackageManager("requests")
-
-        # Create mock versions
-        ver1 = PackageVersion("requests", "2.25.1", "/path/1", is_main=True)
-        ver2 = PackageVersion("requests", "2.26.0", "/path/2", is_main=False)
+        ver1, ver2 = versions
 
         # Add to manager
         manager.versions["2.25.1"] = ver1
         manager.versions["2.26.0"] = ver2
 
         # Mock load method
-        mock_module1 = MagicMock()
-        mock_module2 = MagicMock()
-
-        with patch.object(ver1, 'load', return_value=mock_module1):
-            with patch.object(ver2, 'load', return_value=mock_module2):
-                # Test using valid version
-                result = manager.use_version("2.25.1")
-                assert result == mock_module1
-                assert manager.active_version == "2.25.1"
-
-                # Switch to another version
-                result = manager.use_version("2.26.0")
-                assert result == mock_module2
-                assert manager.active_version == "2.26.0"
+        mock_module1 = object()
+        mock_module2 = object()
 
-                # Test using non-existent version
-                with pytest.raises(VersionNotFoundError):
-                    manager.use_version("nonexistent")
+        with _stub(ver1, 'load', mock_module1), _stub(ver2, 'load', mock_module2):
+            # Test using valid version
+            result = manager.use_version("2.25.1")
+            assert result == mock_module1
+            assert manager.active_version == "2.25.1"
 
-    def test_get_version(self):
-        """Test getting a version without changing active version"""
-        manager = PackageManager("requests")
+            # Switch to another version
+            result = manager.use_version("2.26.0")
+            assert result == mock_module2
+            assert manager.active_version == "2.26.0"
+
+            # Test using non-existent version
+            with pytest.raises(VersionNotFoundError):
+                manager.use_version("nonexistent")
+
+    def test_use_version_loads_outside_lock(self, versions, manager):
+        """Test that module code run by load() can call back into the manager"""
+        ver1, _ = versions
+        manager.versions["2.25.1"] = ver1
+
+        lock_held = []
+
+        def load(*args, **kwargs):
+            # Calling list_versions() here would hang if the lock were held
+            lock_held.append(manager._lock.locked())
+            return object()
 
-        # Create mock versions
-        ver1 = PackageVersion("requests", "2.25.1", "/path/1", is_main=True)
-        ver2 = PackageVersion("requests", "2.26.0", "/path/2", is_main=False)
+        ver1.__dict__['load'] = load
+        try:
+            manager.use_version("2.25.1")
+        finally:
+            del ver1.__dict__['load']
+
+        assert lock_held == [False]
+
+    def test_get_version(self, versions, manager):
+        """Test getting a version without changing active version"""
+        ver1, ver2 = versions
 
         # Add to manager
         manager.versions["2.25.1"] = ver1
@@ -165,37 +242,32 @@ class TestPackageManager:
         manager.active_version = "2.25.1"
 
         # Mock load method
-        mock_module1 = MagicMock()
-        mock_module2 = MagicMock()
-
-        with patch.object(ver1, 'load', return_value=mock_module1):
-            with patch.object(ver2, 'load', return_value=mock_module2):
-                # Test getting active version
-                result = manager.get_version()
-                assert result == mock_module1
-                assert manager.active_version == "2.25.1"  # Unchanged
-
-                # Test getting specific version
-                result = manager.get_version("2.26.0")
-                assert result == mock_module2
-                assert manager.active_version == "2.25.1"  # Still unchanged
-
-                # Test with no active version
-                manager.active_version = None
-                with pytest.raises(ValueError):
-                    manager.get_version()
-
-                # Test getting non-existent version
-                with pytest.raises(VersionNotFoundError):
-                    manager.get_version("nonexistent")
-
-    def test_temporary_version(self):
+        mock_module1 = object()
+        mock_module2 = object()
+
+        with _stub(ver1, 'load', mock_module1), _stub(ver2, 'load', mock_module2):
+            # Test getting active version
+            result = manager.get_version()
+            assert result == mock_module1
+            assert manager.active_version == "2.25.1"  # Unchanged
+
+            # Test getting specific version
+            result = manager.get_version("2.26.0")
+            assert result == mock_module2
+            assert manager.active_version == "2.25.1"  # Still unchanged
+
+            # Test with no active version
+            manager.active_version = None
+            with pytest.raises(ValueError):
+                manager.get_version()
+
+            # Test getting non-existent version
+            with pytest.raises(VersionNotFoundError):
+                manager.get_version("nonexistent")
+
+    def test_temporary_version(self, versions, manager):
         """Test temporarily using a specific version"""
-        manager = PackageManager("requests")
-
-        # Create mock versions
-        ver1 = PackageVersion("requests", "2.25.1", "/path/1", is_main=True)
-        ver2 = PackageVersion("requests", "2.26.0", "/path/2", is_main=False)
+        ver1, ver2 = versions
 
         # Add to manager
         manager.versions["2.25.1"] = ver1
@@ -203,63 +275,61 @@ class TestPackageManager:
         manager.active_version = "2.25.1"
 
         # Mock load method
-        mock_module1 = MagicMock()
-        mock_module2 = MagicMock()
-
-        with patch.object(ver1, 'load', return_value=mock_module1):
-            with patch.object(ver2, 'load', return_value=mock_module2):
-                # Test context manager
-                with manager.temporary_version("2.26.0") as module:
-                    assert module == mock_module2
-                    assert manager.active_version == "2.26.0"
+        mock_module1 = object()
+        mock_module2 = object()
 
-                # After context, should be back to previous
-                assert manager.active_version == "2.25.1"
+        with _stub(ver1, 'load', mock_module1), _stub(ver2, 'load', mock_module2):
+            # Test context manager
+            with manager.temporary_version("2.26.0") as module:
+                assert module == mock_module2
+                assert manager.active_version == "2.26.0"
 
-                # Test with non-existent version
-                with pytest.raises(VersionNotFoundError):
-                    with manager.temporary_version("nonexistent"):
-                        pass
+            # After context, should be back to previous
+            assert manager.active_version == "2.25.1"
 
-                # Test exception inside context
-                try:
-                    with manager.temporary_version("2.26.0"):
-                        assert manager.active_version == "2.26.0"
-                        raise ValueError("Test error")
-                except ValueError:
+            # Test with non-existent version
+            with pytest.raises(VersionNotFoundError):
+                with manager.temporary_version("nonexistent"):
                     pass
 
-                # Should still restore previous version
-                assert manager.active_version == "2.25.1"
+            # Test exception inside context
+            try:
+                with manager.temporary_version("2.26.0"):
+                    assert manager.active_version == "2.26.0"
+                    raise ValueError("Test error")
+            except ValueError:
+                pass
 
-    def test_list_versions(self):
-        """Test listing all versions"""
-        manager = PackageManager("requests")
+            # Should still restore previous version
+            assert manager.active_version == "2.25.1"
 
-        # Create mock versions
-        ver1 = PackageVersion("requests", "2.25.1", "/path/1", is_main=True)
-        ver2 = PackageVersion("requests", "2.26.0", "/path/2", is_main=False)
+    def test_list_versions(self, versions, manager):
+        """Test listing all versions"""
+        ver1, ver2 = versions
 
         # Add to manager
         manager.versions["2.25.1"] = ver1
         manager.versions["2.26.0"] = ver2
         manager.active_version = "2.25.1"
 
-        # Mock get_info method
-        with patch.object(ver1, 'get_info', return_value={"name": "requests", "version": "2.25.1"}):
-            with patch.object(ver2, 'get_info', return_value={"name": "requests", "version": "2.26.0"}):
-                result = manager.list_versions()
-
-                assert len(result) == 2
-                assert result[0]["version"] == "2.25.1"
-                assert result[0]["active"] is True
-                assert result[1]["version"] == "2.26.0"
-                assert result[1]["active"] is False
-
-    def test_get_active_version(self):
+        # Listing must neither load the modules nor ask them for details
+        error = AssertionError("module accessed")
+        with _stub_raising(ver1, 'load', error), _stub_raising(ver2, 'load', error), \
+                _stub_raising(ver1, 'get_info', error), _stub_raising(ver2, 'get_info', error):
+            result = manager.list_versions()
+
+            assert len(result) == 2
+            assert result[0]["version"] == "2.25.1"
+            assert result[0]["path"] == "/path/1"
+            assert result[0]["is_main"] is True
+            assert result[0]["active"] is True
+            assert result[1]["version"] == "2.26.0"
+            assert result[1]["path"] == "/path/2"
+            assert result[1]["is_main"] is False
+            assert result[1]["active"] is False
+
+    def test_get_active_version(self, manager):
         """Test getting active version"""
-        manager = PackageManager("requests")
-
         # No active version
         assert manager.get_active_version() is None
 
@@ -270,10 +340,8 @@ class TestPackageManager:
 
         assert manager.get_active_version() == test_ver
 
-    def test_call(self):
+    def test_call(self, manager):
         """Test calling the manager"""
-        manager = PackageManager("requests")
-
         # No active version
         with pytest.raises(ValueError):
             manager()
@@ -283,7 +351,182 @@ class TestPackageManager:
         manager.versions["2.25.1"] = test_ver
         manager.active_version = "2.25.1"
 
-        mock_module = MagicMock()
-        with patch.object(test_ver, 'load', return_value=mock_module):
+        mock_module = object()
+        with _stub(test_ver, 'load', mock_module):
             result = manager()
-            assert result == mock_module
\ No newline at end of file
+            assert result == mock_module
+
+    def test_loaded_module_fast_path(self, manager):
+        """Test that an already loaded module is returned without calling load()"""
+        test_ver = PackageVersion("requests", "2.25.1", "/path", is_main=True)
+        manager.versions["2.25.1"] = test_ver
+        manager.active_version = "2.25.1"
+
+        mock_module = object()
+        test_ver._module = mock_module
+
+        with patch.object(test_ver, 'load') as mock_load:
+            assert manager() is mock_module
+            assert manager.get_version("2.25.1") is mock_module
+            with manager.temporary_version("2.25.1") as module:
+                assert module is mock_module
+            mock_load.assert_not_called()
+
+        # Unregistering drops the cached module and the info read from it
+        test_ver._info_cache = {"actual_version": "2.25.1"}
+        manager.unregister_version("2.25.1")
+        assert test_ver._module is None
+        assert test_ver._info_cache is None
+
+    def test_reregister_after_unregister_reloads(self, manager, tmp_path):
+        """Test that registering a version again runs its changed code"""
+        module_file = tmp_path / "module.py"
+        module_file.write_text("VALUE = 'old'\n")
+        try:
+            assert manager.register_version("1.0.0", str(module_file)).load().VALUE == "old"
+            manager.unregister_version("1.0.0")
+            assert "requests_1.0.0" not in sys.modules
+
+            # A different size keeps a stale bytecode cache from masking the edit
+            module_file.write_text("VALUE = 'newer'\n")
+            assert manager.register_version("1.0.0", str(module_file)).load().VALUE == "newer"
+        finally:
+            sys.modules.pop("requests_1.0.0", None)
+
+    def test_temporary_version_releases_lock(self, manager):
+        """Test that the lock is not held while inside the temporary_version block"""
+        test_ver = PackageVersion("requests", "2.25.1", "/path", is_main=True)
+        manager.versions["2.25.1"] = test_ver
+        test_ver._module = object()
+
+        acquired = []
+
+        def try_acquire():
+            if manager._lock.acquire(blocking=False):
+                acquired.append(True)
+                manager._lock.release()
+
+        with manager.temporary_version("2.25.1"):
+            thread = threading.Thread(target=try_acquire)
+            thread.start()
+            thread.join()
+
+        assert acquired == [True]
+        assert manager.active_version is None
+
+    def test_temporary_version_is_per_thread(self, versions, manager):
+        """Test that overlapping temporary versions in two threads stay separate"""
+        ver1, ver2 = versions
+        manager.versions["2.25.1"] = ver1
+        manager.versions["2.26.0"] = ver2
+        ver1._module = object()
+        ver2._module = object()
+
+        entered = threading.Event()
+        release = threading.Event()
+        seen = []
+
+        def worker():
+            with manager.temporary_version("2.26.0"):
+                entered.set()
+                release.wait(5)
+                seen.append(manager.active_version)
+
+        thread = threading.Thread(target=worker)
+        with manager.temporary_version("2.25.1"):
+            thread.start()
+            assert entered.wait(5)
+            assert manager.active_version == "2.25.1"
+
+        # This thread left its block first; the other is still inside its own
+        assert manager.active_version is None
+        release.set()
+        thread.join()
+
+        assert seen == ["2.26.0"]
+        assert manager.active_version is None
+
+    def test_temporary_version_is_per_task(self, versions, manager):
+        """Test that overlapping temporary versions in two asyncio tasks stay separate"""
+        ver1, ver2 = versions
+        manager.versions["2.25.1"] = ver1
+        manager.versions["2.26.0"] = ver2
+        ver1._module = object()
+        ver2._module = object()
+        seen = {}
+
+        async def scenario():
+            first_in, second_in, first_out = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+            async def first():
+                with manager.temporary_version("2.25.1"):
+                    first_in.set()
+                    await second_in.wait()
+                seen["first_after"] = manager.active_version
+                first_out.set()
+
+            async def second():
+                await first_in.wait()
+                with manager.temporary_version("2.26.0"):
+                    second_in.set()
+                    # The other task leaves its block while this one is inside
+                    await first_out.wait()
+                    seen["second"] = manager.active_version
+                seen["second_after"] = manager.active_version
+
+            await asyncio.gather(first(), second())
+
+        asyncio.run(scenario())
+
+        assert seen == {"first_after": None, "second": "2.26.0", "second_after": None}
+        assert manager.active_version is None
+
+    def test_batch(self, manager):
+        """Test that saves inside batch() are written once on exit"""
+        config_path = manager.config_path
+
+        manager.versions["2.25.1"] = PackageVersion("requests", "2.25.1", "/path/1", is_main=True)
+        manager.versions["2.26.0"] = PackageVersion("requests", "2.26.0", "/path/2", is_main=False)
+
+        with manager.batch():
+            with manager.batch():
+                manager.active_version = "2.25.1"
+                manager._save_config()
+            # Nested block exiting must not flush
+            assert not os.path.exists(config_path)
+
+            manager.unregister_version("2.26.0")
+            assert not os.path.exists(config_path)
+
+        with open(config_path, 'r') as f:
+            saved_config = json.load(f)
+
+        assert saved_config["active_version"] == "2.25.1"
+        assert [v["version"] for v in saved_config["versions"]] == ["2.25.1"]
+
+    def test_register_versions(self, manager, tmp_path):
+        """Test registering several versions in one call"""
+        for version in ("1.0.0", "2.0.0"):
+            (tmp_path / f"test_module_{version[0]}.py").write_text(f"__version__ = '{version}'\n")
+
+        with patch.object(PackageManager, '_save_config') as mock_save:
+            result = manager.register_versions([
+                ("1.0.0", str(tmp_path / "test_module_1.py"), None),
+                ("2.0.0", str(tmp_path / "test_module_2.py"), {"key": "value"}),
+            ])
+
+            mock_save.assert_called_once()
+
+        assert [pkg_ver.version for pkg_ver in result] == ["1.0.0", "2.0.0"]
+        assert list(manager.versions) == ["1.0.0", "2.0.0"]
+        assert manager.versions["2.0.0"].metadata == {"key": "value"}
+        assert manager.active_version == "1.0.0"
+
+        # A bad path rejects the whole batch
+        with pytest.raises(ValueError):
+            manager.register_versions([
+                ("3.0.0", str(tmp_path / "test_module_1.py"), None),
+                ("4.0.0", str(tmp_path / "missing"), None),
+            ])
+
+        assert "3.0.0" not in manager.versions
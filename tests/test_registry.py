@@ -4,17 +4,22 @@ Tests for the registry module.
 import pytest
 from unittest.mock import patch, MagicMock
 
-from src.package_manager.registry import get_package_manager, _package_managers
+from src.package_manager.registry import get_package_manager
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Fixture giving each test in this module its own empty package manager registry"""
+    managers = {}
+    monkeypatch.setattr("src.package_manager.registry._package_managers", managers)
+    return managers
 
 
 class TestRegistry:
     """Tests for registry module"""
 
-    def test_get_package_manager(self):
+    def test_get_package_manager(self, registry):
         """Test get_package_manager function"""
-        # Clear the registry
-        _package_managers.clear()
-
         # Mock PackageManager
         mock_manager = MagicMock()
 
@@ -24,8 +29,8 @@ class TestRegistry:
 
             mock_init.assert_called_once_with("test_pkg", option1="value1")
             assert manager1 == mock_manager
-            assert "test_pkg" in _package_managers
-            assert _package_managers["test_pkg"] == mock_manager
+            assert "test_pkg" in registry
+            assert registry["test_pkg"] == mock_manager
 
             # Second call should return existing manager
             mock_init.reset_mock()
@@ -44,17 +49,20 @@ class TestRegistry:
 
             mock_init.assert_called_once_with("other_pkg")
             assert manager3 == new_mock_manager
-            assert "other_pkg" in _package_managers
-            assert _package_managers["other_pkg"] == new_mock_manager
+            assert "other_pkg" in registry
+            assert registry["other_pkg"] == new_mock_manager
 
-    def test_registry_singleton_behavior(self):
+    def test_registry_singleton_behavior(self, registry):
         """Test that the registry acts as a singleton for package managers"""
-        # Clear the registry
-        _package_managers.clear()
-
         # Create managers for a couple of packages
         with patch('src.package_manager.registry.PackageManager') as mock_init:
-            mock_init.side_effect = lambda name, **kwargs: MagicMock(name=name, **kwargs)
+            def make_manager(name, **kwargs):
+                # MagicMock(name=...) only names the mock, so set the attribute explicitly
+                manager = MagicMock(**kwargs)
+                manager.name = name
+                return manager
+
+            mock_init.side_effect = make_manager
 
             pkg1_manager = get_package_manager("pkg1")
             pkg2_manager = get_package_manager("pkg2")
@@ -69,6 +77,6 @@ class TestRegistry:
             assert pkg1_again is pkg1_manager
 
             # Registry should contain both managers
-            assert "pkg1" in _package_managers
-            assert "pkg2" in _package_managers
-            assert len(_package_managers) == 2
\ No newline at end of file
+            assert "pkg1" in registry
+            assert "pkg2" in registry
+            assert len(registry) == 2
\ No newline at end of file
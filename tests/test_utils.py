@@ -2,22 +2,35 @@
 Tests for utility functions.
 """
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import call, patch, MagicMock
 
 from src.package_manager.utils import setup_package_manager, import_version, create_decorator
 from src.package_manager.manager import PackageManager
 from src.package_manager.exceptions import VersionNotFoundError
 
 
+@pytest.fixture
+def mock_manager():
+    """Fixture providing a PackageManager mock for get_package_manager to return"""
+    # Built per test: copies of one mock would share their recorded calls
+    return MagicMock(spec=PackageManager)
+
+
 class TestUtils:
     """Tests for utility functions"""
 
-    def test_setup_package_manager(self):
+    def test_setup_package_manager(self, mock_manager):
         """Test setup_package_manager function"""
-        # Mock get_package_manager
-        mock_manager = MagicMock(spec=PackageManager)
         mock_manager.versions = {}
 
+        # Mock register_versions to add to versions
+        def mock_register_versions(items):
+            for version, path, metadata in items:
+                mock_manager.versions[version] = True
+            return [MagicMock() for _ in items]
+
+        mock_manager.register_versions.side_effect = mock_register_versions
+
         with patch('src.package_manager.utils.get_package_manager', return_value=mock_manager) as mock_get_manager:
             # Test with register_main=True
             result = setup_package_manager(
@@ -36,29 +49,30 @@ class TestUtils:
             # Verify calls
             mock_get_manager.assert_called_once_with("pytest")
             mock_manager.register_main_version.assert_called_once()
-            assert mock_manager.register_version.call_count == 2
-
-            # Check register version calls
-            mock_manager.register_version.assert_any_call("custom", "/path/to/custom")
-            mock_manager.register_version.assert_any_call("special", "/path/to/special", metadata={"key": "value"})
+            # Check versions are registered in a single call
+            mock_manager.register_versions.assert_called_once_with([
+                ("custom", "/path/to/custom", None),
+                ("special", "/path/to/special", {"key": "value"}),
+            ])
+            mock_manager.register_version.assert_not_called()
+            mock_manager.batch.assert_called_once()
 
             # Check default version
             mock_manager.use_version.assert_called_once_with("custom")
 
             assert result == mock_manager
 
-    def test_setup_package_manager_no_default(self):
+    def test_setup_package_manager_no_default(self, mock_manager):
         """Test setup_package_manager with non-existent default"""
-        # Mock get_package_manager
-        mock_manager = MagicMock(spec=PackageManager)
         mock_manager.versions = {}
 
-        # Mock register_version to add to versions
-        def mock_register(version, path, metadata=None):
-            mock_manager.versions[version] = True
-            return MagicMock()
+        # Mock register_versions to add to versions
+        def mock_register_versions(items):
+            for version, path, metadata in items:
+                mock_manager.versions[version] = True
+            return [MagicMock() for _ in items]
 
-        mock_manager.register_version.side_effect = mock_register
+        mock_manager.register_versions.side_effect = mock_register_versions
 
         with patch('src.package_manager.utils.get_package_manager', return_value=mock_manager):
             with patch('src.package_manager.utils.warnings') as mock_warnings:
@@ -73,10 +87,8 @@ class TestUtils:
                 # Should show warning
                 mock_warnings.warn.assert_called_once()
 
-    def test_import_version(self):
+    def test_import_version(self, mock_manager):
         """Test import_version function"""
-        # Mock get_package_manager
-        mock_manager = MagicMock(spec=PackageManager)
         mock_module = MagicMock()
         mock_manager.get_version.return_value = mock_module
 
@@ -85,23 +97,20 @@ class TestUtils:
             result = import_version("pytest", "7.0.0")
 
             mock_get_manager.assert_called_once_with("pytest")
-            mock_manager.get_version.assert_called_once_with("7.0.0")
             assert result == mock_module
 
+        # A fresh patch for the second case instead of resetting the first
+        with patch('src.package_manager.utils.get_package_manager', return_value=mock_manager) as mock_get_manager:
             # Test with default version
-            mock_get_manager.reset_mock()
-            mock_manager.get_version.reset_mock()
-
             result = import_version("pytest")
 
             mock_get_manager.assert_called_once_with("pytest")
-            mock_manager.get_version.assert_called_once_with(None)
             assert result == mock_module
 
-    def test_create_decorator(self):
+        assert mock_manager.get_version.call_args_list == [call("7.0.0"), call(None)]
+
+    def test_create_decorator(self, mock_manager):
         """Test create_decorator function"""
-        # Mock get_package_manager
-        mock_manager = MagicMock(spec=PackageManager)
         mock_manager.versions = {"7.0.0": True}
 
         # Create a mock context manager
@@ -130,10 +139,8 @@ class TestUtils:
         # Run the test
         test_decorator()
 
-    def test_decorator_preserves_metadata(self):
+    def test_decorator_preserves_metadata(self, mock_manager):
         """Test that decorator preserves function metadata"""
-        # Mock get_package_manager
-        mock_manager = MagicMock(spec=PackageManager)
         mock_manager.versions = {"7.0.0": True}
 
         with patch('src.package_manager.utils.get_package_manager', return_value=mock_manager):
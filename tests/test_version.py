@@ -1,14 +1,49 @@
 """
 Tests for the PackageVersion class.
 """
+import itertools
 import os
+import py_compile
 import sys
 import pytest
-import tempfile
 from unittest.mock import patch, MagicMock
 
-from src.package_manager.version import PackageVersion
-from src.package_manager.exceptions import ImportError
+from src.package_manager import version as version_module
+from src.package_manager.version import PackageVersion, _Kind, _resolve_module_location
+from src.package_manager.exceptions import PackageImportError
+
+
+@pytest.fixture(scope="module")
+def pkg_layout(tmp_path_factory):
+    """Fixture providing a package directory and a module file on disk"""
+    root = tmp_path_factory.mktemp("pkg")
+
+    # Create package structure with an __init__.py file
+    pkg_dir = root / "test_pkg"
+    pkg_dir.mkdir()
+    (pkg_dir / "__init__.py").write_text("__version__ = '1.0.0'\n")
+
+    # Create a single module file
+    module_file = root / "test_module.py"
+    module_file.write_text("__version__ = '1.0.0'\n")
+
+    return str(pkg_dir), str(module_file)
+
+
+@pytest.fixture
+def fake_clock():
+    """Fixture making version.py read 1, 2, 3, ... from time.time()"""
+    # patch.object needs no import, so it also works once import_module is mocked
+    with patch.object(version_module, 'time') as mock_time:
+        mock_time.time.side_effect = itertools.count(1)
+        yield mock_time
+
+
+@pytest.fixture
+def mock_import():
+    """Fixture patching importlib.import_module; configure it per test"""
+    with patch('importlib.import_module') as mock:
+        yield mock
 
 
 class TestPackageVersion:
@@ -35,105 +70,112 @@ class TestPackageVersion:
         assert repr(pkg_ver1) == "<PackageVersion test_pkg:1.0.0 (main)>"
         assert repr(pkg_ver2) == "<PackageVersion test_pkg:2.0.0 >"
 
-    def test_load_main_version(self):
+    def test_load_main_version(self, mock_import, fake_clock):
         """Test loading main package version"""
-        with patch('importlib.import_module') as mock_import:
-            mock_module = MagicMock()
-            mock_import.return_value = mock_module
+        mock_module = object()
+        mock_import.return_value = mock_module
 
-            pkg_ver = PackageVersion("pytest", "main", "", is_main=True)
-            result = pkg_ver.load()
+        pkg_ver = PackageVersion("pytest", "main", "", is_main=True)
+        result = pkg_ver.load()
 
-            mock_import.assert_called_once_with("pytest")
-            assert result == mock_module
-            assert pkg_ver._module == mock_module
-            assert pkg_ver._last_loaded > 0
+        mock_import.assert_called_once_with("pytest")
+        assert result == mock_module
+        assert pkg_ver._module == mock_module
+        assert pkg_ver._last_loaded == 1
 
-    def test_load_main_version_error(self):
+    def test_load_main_version_error(self, mock_import):
         """Test error handling when loading main version fails"""
-        with patch('importlib.import_module', side_effect=Exception("Test error")):
-            pkg_ver = PackageVersion("nonexistent_pkg", "main", "", is_main=True)
+        mock_import.side_effect = Exception("Test error")
+        pkg_ver = PackageVersion("nonexistent_pkg", "main", "", is_main=True)
 
-            with pytest.raises(ImportError) as exc_info:
-                pkg_ver.load()
+        with pytest.raises(PackageImportError) as exc_info:
+            pkg_ver.load()
 
-            assert "Failed to import main package nonexistent_pkg" in str(exc_info.value)
-
-    def test_load_custom_version_directory(self):
-        """Test loading a custom version from a directory"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create package structure
-            pkg_dir = os.path.join(temp_dir, "test_pkg")
-            os.makedirs(pkg_dir)
-
-            # Create an __init__.py file
-            with open(os.path.join(pkg_dir, "__init__.py"), "w") as f:
-                f.write("__version__ = '1.0.0'\n")
-
-            pkg_ver = PackageVersion("test_pkg", "1.0.0", pkg_dir, is_main=False)
-
-            # Mock spec creation to avoid actual import
-            with patch('importlib.util.spec_from_file_location') as mock_spec_from_file_location:
-                mock_spec = MagicMock()
-                mock_loader = MagicMock()
-                mock_spec.loader = mock_loader
-                mock_spec.name = "test_pkg_1.0.0"
-                mock_spec_from_file_location.return_value = mock_spec
-
-                with patch('importlib.util.module_from_spec') as mock_module_from_spec:
-                    mock_module = MagicMock()
-                    mock_module.__version__ = "1.0.0"
-                    mock_module_from_spec.return_value = mock_module
-
-                    result = pkg_ver.load()
-
-                    # Check the right path was used
-                    mock_spec_from_file_location.assert_called_once_with(
-                        "test_pkg_1.0.0",
-                        os.path.join(pkg_dir, "__init__.py")
-                    )
-                    mock_module_from_spec.assert_called_once_with(mock_spec)
-                    mock_loader.exec_module.assert_called_once_with(mock_module)
-                    assert result == mock_module
-                    assert pkg_ver._module == mock_module
-
-    def test_load_custom_version_file(self):
-        """Test loading a custom version from a file"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create a single module file
-            module_file = os.path.join(temp_dir, "test_module.py")
-            with open(module_file, "w") as f:
-                f.write("__version__ = '1.0.0'\n")
-
-            pkg_ver = PackageVersion("test_module", "1.0.0", module_file, is_main=False)
-
-            # Mock spec creation to avoid actual import
-            with patch('importlib.util.spec_from_file_location') as mock_spec_from_file_location:
-                mock_spec = MagicMock()
-                mock_loader = MagicMock()
-                mock_spec.loader = mock_loader
-                mock_spec.name = "test_module_1.0.0"
-                mock_spec_from_file_location.return_value = mock_spec
-
-                with patch('importlib.util.module_from_spec') as mock_module_from_spec:
-                    mock_module = MagicMock()
-                    mock_module.__version__ = "1.0.0"
-                    mock_module_from_spec.return_value = mock_module
-
-                    result = pkg_ver.load()
-
-                    # Check the right path was used
-                    mock_spec_from_file_location.assert_called_once_with(
-                        "test_module_1.0.0",
-                        module_file
-                    )
-                    assert result == mock_module
+        assert "Failed to import main package nonexistent_pkg" in str(exc_info.value)
+
+    @pytest.mark.parametrize("kind", ["directory", "file"])
+    def test_load_custom_version(self, kind, pkg_layout):
+        """Test loading a custom version from a directory or a file"""
+        pkg_dir, module_file = pkg_layout
+        if kind == "directory":
+            name, path, expected_path = "test_pkg", pkg_dir, os.path.join(pkg_dir, "__init__.py")
+        else:
+            name, path, expected_path = "test_module", module_file, module_file
+
+        pkg_ver = PackageVersion(name, "1.0.0", path, is_main=False)
+
+        # Mock spec creation to avoid actual import
+        with patch('importlib.util.spec_from_file_location') as mock_spec_from_file_location:
+            mock_spec = MagicMock()
+            mock_loader = MagicMock()
+            mock_spec.loader = mock_loader
+            mock_spec.name = f"{name}_1.0.0"
+            mock_spec_from_file_location.return_value = mock_spec
+
+            with patch('importlib.util.module_from_spec') as mock_module_from_spec:
+                mock_module = MagicMock()
+                mock_module.__version__ = "1.0.0"
+                mock_module_from_spec.return_value = mock_module
+
+                result = pkg_ver.load()
+
+                # Check the right path was used
+                mock_spec_from_file_location.assert_called_once_with(
+                    f"{name}_1.0.0",
+                    expected_path
+                )
+                mock_module_from_spec.assert_called_once_with(mock_spec)
+                mock_loader.exec_module.assert_called_once_with(mock_module)
+                assert result == mock_module
+                assert pkg_ver._module == mock_module
+
+    def test_load_custom_version_reuses_sys_modules(self, tmp_path):
+        """Test an already executed module is reused unless forced"""
+        module_file = tmp_path / "reused_module.py"
+        module_file.write_text("__version__ = '1.0.0'\n")
+
+        first = PackageVersion("reused_module", "1.0.0", str(module_file)).load()
+        second_ver = PackageVersion("reused_module", "1.0.0", str(module_file))
+        try:
+            assert second_ver.load() is first
+            assert second_ver.load(force=True) is not first
+        finally:
+            sys.modules.pop("reused_module_1.0.0", None)
+
+    def test_failed_load_is_not_reused(self, tmp_path):
+        """Test a module whose code raised is not left in sys.modules for reuse"""
+        module_file = tmp_path / "broken_module.py"
+        module_file.write_text("X = 1\nraise RuntimeError('boom')\nY = 2\n")
+
+        for _ in range(2):
+            pkg_ver = PackageVersion("broken_module", "1.0.0", str(module_file))
+            with pytest.raises(PackageImportError):
+                pkg_ver.load()
+            assert "broken_module_1.0.0" not in sys.modules
+
+    def test_load_bare_name_keeps_versioned_name(self, tmp_path):
+        """Test a module found by name does not replace the installed package"""
+        # A sourceless module is only found by the import system, not on disk
+        source = tmp_path / "json_source.py"
+        source.write_text("VALUE = 42\n")
+        py_compile.compile(str(source), cfile=str(tmp_path / "json.pyc"))
+        source.unlink()
+
+        installed = sys.modules["json"]
+        pkg_ver = PackageVersion("json", "9.9.9", str(tmp_path / "json"))
+        try:
+            module = pkg_ver.load()
+            assert module.VALUE == 42
+            assert module.__name__ == "json_9.9.9"
+            assert sys.modules["json"] is installed
+        finally:
+            sys.modules.pop("json_9.9.9", None)
 
     def test_load_custom_version_error(self):
         """Test error handling when loading custom version fails"""
         pkg_ver = PackageVersion("test_pkg", "1.0.0", "/nonexistent/path", is_main=False)
 
-        with pytest.raises(ImportError) as exc_info:
+        with pytest.raises(PackageImportError) as exc_info:
             pkg_ver.load()
 
         assert "Failed to import package test_pkg" in str(exc_info.value)
@@ -178,27 +220,93 @@ class TestPackageVersion:
             assert "author" not in info
             assert "doc" not in info
 
-    def test_cache_behavior(self):
-        """Test caching behavior"""
+    def test_get_info_cached(self):
+        """Test get_info reuses its result until the module is reloaded"""
         pkg_ver = PackageVersion("test_pkg", "1.0.0", "/path", is_main=True)
 
-        # Mock load functionality
         mock_module = MagicMock()
+        mock_module.__version__ = "1.0.0"
+
         with patch('importlib.import_module', return_value=mock_module) as mock_import:
-            # First load
-            result1 = pkg_ver.load()
-            assert result1 == mock_module
-            assert pkg_ver._module == mock_module
+            info1 = pkg_ver.get_info()
+            info1["actual_version"] = "changed"
+
+            info2 = pkg_ver.get_info()
+            assert info2["actual_version"] == "1.0.0"
             mock_import.assert_called_once_with("test_pkg")
 
-            # Second load should use cache
-            mock_import.reset_mock()
-            result2 = pkg_ver.load()
-            assert result2 == mock_module
+            mock_module.__version__ = "2.0.0"
+            pkg_ver.load(force=True)
+            assert pkg_ver.get_info()["actual_version"] == "2.0.0"
+
+    def test_cache_behavior(self, mock_import, fake_clock):
+        """Test caching behavior"""
+        pkg_ver = PackageVersion("test_pkg", "1.0.0", "/path", is_main=True)
+
+        # Mock load functionality
+        mock_module = object()
+        mock_import.return_value = mock_module
+
+        # First load
+        result1 = pkg_ver.load()
+        assert result1 == mock_module
+        assert pkg_ver._module == mock_module
+        assert pkg_ver._last_loaded == 1
+        mock_import.assert_called_once_with("test_pkg")
+
+        # Second load should use cache without reading the clock
+        mock_import.reset_mock()
+        result2 = pkg_ver.load()
+        assert result2 == mock_module
+        assert pkg_ver._last_loaded == 1
+        mock_import.assert_not_called()
+
+        # Force reload
+        mock_import.reset_mock()
+        result3 = pkg_ver.load(force=True)
+        assert result3 == mock_module
+        assert pkg_ver._last_loaded == 2
+        mock_import.assert_called_once_with("test_pkg")
+
+    def test_cache_does_not_expire(self):
+        """Test a loaded module is reused regardless of when it was loaded"""
+        pkg_ver = PackageVersion("test_pkg", "1.0.0", "/path", is_main=True)
+        mock_module = MagicMock()
+        pkg_ver._module = mock_module
+        pkg_ver._last_loaded = 0
+
+        with patch('importlib.import_module') as mock_import:
+            assert pkg_ver.load() is mock_module
             mock_import.assert_not_called()
 
-            # Force reload
-            mock_import.reset_mock()
-            result3 = pkg_ver.load(force=True)
-            assert result3 == mock_module
-            mock_import.assert_called_once_with("test_pkg")
\ No newline at end of file
+    def test_resolve_module_location_is_memoized(self, tmp_path):
+        """Test path resolution is cached until explicitly cleared"""
+        pkg_dir = tmp_path / "test_pkg"
+        pkg_dir.mkdir()
+        init_path = pkg_dir / "__init__.py"
+        init_path.write_text("")
+        expected = (_Kind.DIR_PKG, str(init_path))
+
+        PackageVersion.invalidate_path_cache()
+        assert _resolve_module_location(str(pkg_dir)) == expected
+
+        with patch('src.package_manager.version._stat') as mock_stat:
+            assert _resolve_module_location(str(pkg_dir)) == expected
+            mock_stat.assert_not_called()
+
+        init_path.unlink()
+        PackageVersion.invalidate_path_cache()
+        with pytest.raises(PackageImportError):
+            _resolve_module_location(str(pkg_dir))
+
+    def test_resolve_module_location_stats_each_path_once(self, tmp_path):
+        """Test a package directory is resolved with one stat per probed path"""
+        pkg_dir = tmp_path / "test_pkg"
+        pkg_dir.mkdir()
+        init_path = pkg_dir / "__init__.py"
+        init_path.write_text("")
+
+        PackageVersion.invalidate_path_cache()
+        with patch('src.package_manager.version._stat', wraps=version_module._stat) as mock_stat:
+            assert _resolve_module_location(str(pkg_dir)) == (_Kind.DIR_PKG, str(init_path))
+        assert [c.args[0] for c in mock_stat.call_args_list] == [str(pkg_dir), str(init_path)]
\ No newline at end of file